@@ -0,0 +1,66 @@
+import json
+import os
+import re
+import uuid
+
+from fastapi import APIRouter, UploadFile, File, HTTPException
+from fastapi.responses import FileResponse, StreamingResponse
+from api.routes_generate import DOCX_MEDIA_TYPE
+from services.batch_pipeline import MAX_BATCH_FILES, analysis_stages, remove_batch, run_pipeline, save_batch
+from services.output_formatter import OUTPUT_DIR
+
+router = APIRouter()
+
+DOCUMENT_ID_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+
+
+async def stream_events(batch_id, documents, save_events):
+    failed = sum(event["status"] == "failed" for event in save_events)
+    try:
+        for event in save_events:
+            yield json.dumps({"batch_id": batch_id, **event}) + "\n"
+        async for event in run_pipeline(documents, analysis_stages()):
+            if event["status"] == "failed":
+                failed += 1
+            yield json.dumps({"batch_id": batch_id, **event}) + "\n"
+    finally:
+        # Uploads are only needed while the pipeline runs, including when the client disconnects
+        remove_batch(batch_id)
+    total = len(save_events)
+    yield json.dumps({
+        "batch_id": batch_id,
+        "stage": "batch",
+        "status": "complete",
+        "total": total,
+        "succeeded": total - failed,
+        "failed": failed,
+    }) + "\n"
+
+
+@router.post("/")
+async def batch_generate(files: list[UploadFile] = File(...)):
+    """Process many documents (or zip archives of them) in one request.
+
+    Streams NDJSON progress events as each document moves through the
+    extract, analyze and format stages. Each "done" event carries a
+    document_id whose report is served by GET /api/batch/results/{document_id}.
+    """
+    if len(files) > MAX_BATCH_FILES:
+        raise HTTPException(status_code=413, detail=f"Batch exceeds {MAX_BATCH_FILES} files")
+    batch_id = uuid.uuid4().hex
+    try:
+        documents, save_events = await save_batch(files, batch_id)
+    except ValueError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    return StreamingResponse(
+        stream_events(batch_id, documents, save_events),
+        media_type="application/x-ndjson",
+    )
+
+
+@router.get("/results/{document_id}")
+async def get_batch_result(document_id: str):
+    output_path = f"{OUTPUT_DIR}/{document_id}.docx"
+    if not DOCUMENT_ID_PATTERN.match(document_id) or not os.path.isfile(output_path):
+        raise HTTPException(status_code=404, detail="Result not found")
+    return FileResponse(output_path, media_type=DOCX_MEDIA_TYPE, filename=f"{document_id}.docx")
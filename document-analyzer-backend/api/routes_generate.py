@@ -1,12 +1,93 @@
-from fastapi import APIRouter
-from services.ai_processor import analyze_document
-from services.output_formatter import create_docx
 import os
+import uuid
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import FileResponse, StreamingResponse
+from models.document_model import GenerateJobRequest
+from services.ai_processor import analyze_document
+from services.document_parser import (
+    SUPPORTED_EXTENSIONS,
+    UPLOAD_DIR,
+    DocumentParseError,
+    UnsupportedFileTypeError,
+    extract_text,
+    original_filename,
+)
+from services.job_queue import STATUS_SUCCEEDED, job_queue
+from services.output_formatter import create_docx_async, render_docx_async
+from utils.file_storage import CHUNK_SIZE
 
 router = APIRouter()
 
+DOCX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+
+def resolve_upload_path(path):
+    # Only documents previously stored by the upload endpoint may be processed
+    upload_dir = os.path.realpath(UPLOAD_DIR)
+    resolved = os.path.realpath(path)
+    if os.path.dirname(resolved) != upload_dir or not os.path.isfile(resolved):
+        raise HTTPException(status_code=404, detail="Uploaded file not found")
+    return resolved
+
+
+async def analyze_upload(path):
+    # The cache key is always hashed server-side; never trust a client-supplied hash
+    try:
+        input_text = await extract_text(resolve_upload_path(path))
+    except UnsupportedFileTypeError as e:
+        raise HTTPException(status_code=415, detail=str(e))
+    except DocumentParseError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return await analyze_document(input_text)
+
+
 @router.get("/")
-async def generate_document():
-    extracted_text = await analyze_document("Example input text here from parsing!")
-    output_path = create_docx(extracted_text, "final_output")
+async def generate_document(path: str):
+    extracted_text = await analyze_upload(path)
+    output_path = await create_docx_async(extracted_text, uuid.uuid4().hex)
     return {"message": "Document Generated", "path": output_path}
+
+
+@router.get("/download")
+async def download_document(path: str):
+    # Same as generate_document but streams the .docx without saving it
+    extracted_text = await analyze_upload(path)
+    content = await render_docx_async(extracted_text)
+    chunks = (content[i:i + CHUNK_SIZE] for i in range(0, len(content), CHUNK_SIZE))
+    filename = os.path.splitext(original_filename(path))[0].replace('"', "") or "report"
+    return StreamingResponse(
+        chunks,
+        media_type=DOCX_MEDIA_TYPE,
+        headers={"Content-Disposition": f'attachment; filename="{filename}_analysis.docx"'},
+    )
+
+
+@router.post("/jobs", status_code=202)
+async def submit_generate_job(request: GenerateJobRequest):
+    input_path = resolve_upload_path(request.path)
+    extension = os.path.splitext(input_path)[1].lower()
+    if extension not in SUPPORTED_EXTENSIONS:
+        raise HTTPException(status_code=415, detail=f"Unsupported file type: {extension or input_path}")
+    job = await job_queue.submit(input_path, request.priority)
+    return {"job_id": job["id"], "status": job["status"]}
+
+
+async def get_job_or_404(job_id):
+    job = await job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.get("/jobs/{job_id}")
+async def get_generate_job(job_id: str):
+    return await get_job_or_404(job_id)
+
+
+@router.get("/jobs/{job_id}/result")
+async def get_generate_job_result(job_id: str):
+    job = await get_job_or_404(job_id)
+    if job["status"] != STATUS_SUCCEEDED:
+        raise HTTPException(status_code=409, detail=f"Job is {job['status']}")
+    return FileResponse(job["output_path"], media_type=DOCX_MEDIA_TYPE, filename=f"{job_id}.docx")
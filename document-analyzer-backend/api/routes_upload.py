@@ -1,10 +1,17 @@
-from fastapi import APIRouter, UploadFile, File
-from services.document_parser import save_upload_file
-import os
+from fastapi import APIRouter, UploadFile, File, HTTPException
+from services.document_parser import FileTooLargeError, save_upload_file
 
 router = APIRouter()
 
 @router.post("/")
 async def upload_file(file: UploadFile = File(...)):
-    save_path = await save_upload_file(file)
-    return {"message": "File uploaded successfully", "path": save_path}
+    try:
+        stored = await save_upload_file(file)
+    except FileTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    return {
+        "message": "File uploaded successfully",
+        "path": stored.path,
+        "sha256": stored.sha256,
+        "size": stored.size,
+    }
@@ -0,0 +1,69 @@
+"""Compare a benchmark result file against a stored baseline.
+
+    python -m benchmarks.compare benchmarks/results/latest.json benchmarks/baseline.json --threshold 0.25
+
+The baseline is committed at benchmarks/baseline.json; refresh it by copying
+a run_benchmarks output there.
+
+Exits with status 1 when any stage/concurrency level regressed by more than
+the threshold (throughput down, p95 latency or peak memory up).
+"""
+import argparse
+import json
+import sys
+
+# (metric, True when higher is better)
+CHECKS = (
+    ("throughput_per_s", True),
+    ("p95_ms", False),
+    ("peak_rss_mb", False),
+)
+
+
+def compare_results(current, baseline, threshold):
+    """Return a list of human-readable regression descriptions."""
+    regressions = []
+    for stage, levels in baseline["results"].items():
+        for level, base in levels.items():
+            result = current["results"].get(stage, {}).get(level)
+            if result is None:
+                regressions.append(f"{stage} {level}: missing from current results")
+                continue
+            for metric, higher_is_better in CHECKS:
+                before, after = base.get(metric), result.get(metric)
+                if not before or after is None:
+                    continue
+                change = (after - before) / before
+                if (higher_is_better and change < -threshold) or (not higher_is_better and change > threshold):
+                    regressions.append(
+                        f"{stage} {level}: {metric} {before:.2f} -> {after:.2f} ({change:+.0%})"
+                    )
+    return regressions
+
+
+def check(current, baseline, threshold):
+    regressions = compare_results(current, baseline, threshold)
+    if regressions:
+        print(f"{len(regressions)} regression(s) beyond {threshold:.0%}:")
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1
+    print(f"No regressions beyond {threshold:.0%}")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("current")
+    parser.add_argument("baseline")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed relative change (0.25 = 25%%)")
+    args = parser.parse_args()
+    with open(args.current) as f:
+        current = json.load(f)
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    sys.exit(check(current, baseline, args.threshold))
+
+
+if __name__ == "__main__":
+    main()
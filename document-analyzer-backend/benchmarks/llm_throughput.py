@@ -0,0 +1,37 @@
+"""Measure how many LLM calls one worker completes per second.
+
+Calls chat_completion directly so the analysis cache is not involved.
+
+Start the stub first (``python -m benchmarks.stub_openai``), then run
+``OPENAI_API_KEY=stub OPENAI_BASE_URL=http://127.0.0.1:8900/v1 python -m benchmarks.llm_throughput``.
+"""
+import argparse
+import asyncio
+import time
+
+from services import ai_processor
+
+
+async def run(total, text):
+    await ai_processor.start_client()
+    try:
+        start = time.perf_counter()
+        prompt = ai_processor.PROMPT_TEMPLATE.format(text=text)
+        await asyncio.gather(*(ai_processor.chat_completion(prompt) for _ in range(total)))
+        elapsed = time.perf_counter() - start
+    finally:
+        await ai_processor.stop_client()
+    print(f"{total} requests in {elapsed:.2f}s -> {total / elapsed:.1f} req/s "
+          f"(LLM_MAX_CONCURRENCY={ai_processor.LLM_MAX_CONCURRENCY})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--text", default="Shelter capacity: 40 dogs, 25 cats.")
+    args = parser.parse_args()
+    asyncio.run(run(args.requests, args.text))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,305 @@
+"""Benchmark the upload -> extract -> analyze -> format pipeline in-process.
+
+    python -m benchmarks.run_benchmarks --concurrency 1,4,16 --requests 20 \\
+        --llm-latency 0.2 --output benchmarks/results/latest.json \\
+        --baseline benchmarks/baseline.json
+
+The FastAPI app runs in-process against a stub OpenAI server, in a scratch
+working directory so storage/ and its caches start cold. Each stage is
+measured on its own and end to end at every concurrency level; results are
+written as JSON and, with --baseline, compared (see benchmarks.compare).
+The committed baseline lives at benchmarks/baseline.json; benchmarks/results/
+is git-ignored scratch output.
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import resource
+import socket
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+import httpx
+import uvicorn
+
+from benchmarks.compare import check
+from benchmarks.stub_openai import create_stub_app
+from benchmarks.synthetic_docs import DOCUMENT_MIX, make_analysis, make_document, make_text
+
+STAGES = ("upload", "extraction", "analysis", "formatting", "end_to_end")
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class StubServer:
+    """Stub OpenAI server running in a background thread."""
+
+    def __init__(self, latency):
+        self.port = _free_port()
+        config = uvicorn.Config(create_stub_app(latency), host="127.0.0.1", port=self.port, log_level="warning")
+        self.server = uvicorn.Server(config)
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.port}/v1"
+
+    def __enter__(self):
+        self.thread.start()
+        while not self.server.started:
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.should_exit = True
+        self.thread.join()
+
+
+def _rss_mb(pid):
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return 0.0
+
+
+class MemorySampler:
+    """Tracks peak RSS of this process plus the worker pool processes."""
+
+    def __init__(self, interval=0.01):
+        self.interval = interval
+        self.peak = 0.0
+        self._task = None
+
+    def current(self):
+        from utils import worker_pool
+
+        if not os.path.exists("/proc/self/status"):
+            # No procfs (e.g. macOS): fall back to the lifetime high-water mark
+            usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            return usage / (1024 * 1024) if sys.platform == "darwin" else usage / 1024
+        pids = [os.getpid()]
+        if worker_pool._pool is not None:
+            pids.extend(worker_pool._pool._processes or {})
+        return sum(_rss_mb(pid) for pid in pids)
+
+    async def _sample(self):
+        while True:
+            self.peak = max(self.peak, self.current())
+            await asyncio.sleep(self.interval)
+
+    def __enter__(self):
+        self.peak = self.current()
+        self._task = asyncio.get_running_loop().create_task(self._sample())
+        return self
+
+    def __exit__(self, *exc_info):
+        self._task.cancel()
+        self.peak = max(self.peak, self.current())
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    # Nearest-rank percentile
+    index = min(len(sorted_values) - 1, max(0, math.ceil(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+async def measure(operations, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    errors = []
+
+    async def run(operation):
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                await operation()
+            except Exception as e:
+                errors.append(repr(e))
+                return
+            latencies.append(time.perf_counter() - start)
+
+    with MemorySampler() as sampler:
+        start = time.perf_counter()
+        await asyncio.gather(*(run(operation) for operation in operations))
+        wall = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "requests": len(operations),
+        "errors": len(errors),
+        "first_error": errors[0] if errors else None,
+        "wall_s": round(wall, 4),
+        "throughput_per_s": round(len(latencies) / wall, 3) if wall else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+        "peak_rss_mb": round(sampler.peak, 1),
+    }
+
+
+def _documents(stage, concurrency, count):
+    """Unique documents cycling through DOCUMENT_MIX, so caches stay cold."""
+    for index in range(count):
+        name, kind, size = DOCUMENT_MIX[index % len(DOCUMENT_MIX)]
+        seed = f"{stage}-c{concurrency}-{index}"
+        yield seed, name, kind, size
+
+
+def _pages_for(kind, size):
+    # DOCX sizes are paragraphs; roughly ten per page
+    return size if kind == "pdf" else max(1, size // 10)
+
+
+def build_operations(stage, concurrency, count, client):
+    from services.ai_processor import analyze_document
+    from services.document_parser import UPLOAD_DIR, extract_text
+    from services.output_formatter import render_docx_async
+
+    operations = []
+    for seed, name, kind, size in _documents(stage, concurrency, count):
+        if stage == "upload":
+            extension, content = make_document(seed, kind, size)
+
+            async def operation(filename=f"{seed}{extension}", content=content):
+                response = await client.post("/api/upload/", files={"file": (filename, content)})
+                response.raise_for_status()
+        elif stage == "extraction":
+            # Files are written up front; only extraction is timed
+            extension, content = make_document(seed, kind, size)
+            path = f"{UPLOAD_DIR}/{seed}{extension}"
+            os.makedirs(UPLOAD_DIR, exist_ok=True)
+            with open(path, "wb") as f:
+                f.write(content)
+
+            async def operation(path=path):
+                await extract_text(path)
+        elif stage == "analysis":
+            text = make_text(seed, _pages_for(kind, size))
+
+            async def operation(text=text):
+                await analyze_document(text)
+        elif stage == "formatting":
+            analysis = make_analysis(seed, max(2, _pages_for(kind, size) // 4))
+
+            async def operation(analysis=analysis):
+                await render_docx_async(analysis)
+        else:
+            extension, content = make_document(seed, kind, size)
+
+            async def operation(filename=f"{seed}{extension}", content=content):
+                response = await client.post("/api/upload/", files={"file": (filename, content)})
+                response.raise_for_status()
+                stored = response.json()
+                response = await client.get("/api/generate/", params={"path": stored["path"]})
+                response.raise_for_status()
+        operations.append(operation)
+    return operations
+
+
+async def warm_up(client):
+    # Start the worker processes and LLM connections outside the timed runs
+    for operation in build_operations("end_to_end", 0, 1, client):
+        await operation()
+
+
+async def run_benchmarks(stages, levels, count):
+    from main import app
+
+    results = {}
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=None) as client:
+            await warm_up(client)
+            for stage in stages:
+                results[stage] = {}
+                for concurrency in levels:
+                    operations = build_operations(stage, concurrency, count, client)
+                    result = await measure(operations, concurrency)
+                    results[stage][f"c{concurrency}"] = result
+                    print(
+                        f"{stage:<11} c={concurrency:<3} {result['throughput_per_s']:>8.2f}/s "
+                        f"p50={result['p50_ms']:.1f}ms p95={result['p95_ms']:.1f}ms "
+                        f"p99={result['p99_ms']:.1f}ms rss={result['peak_rss_mb']:.0f}MB "
+                        f"errors={result['errors']}",
+                        flush=True,
+                    )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", default="1,4,16", help="comma-separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=20, help="operations per stage and level")
+    parser.add_argument("--stages", default=",".join(STAGES), help="comma-separated subset of " + ",".join(STAGES))
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="stub OpenAI response time in seconds")
+    parser.add_argument("--output", default="benchmarks/results/latest.json")
+    parser.add_argument("--baseline", help="baseline JSON to compare against; exit 1 on regression")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed relative regression")
+    args = parser.parse_args()
+
+    levels = [int(level) for level in args.concurrency.split(",")]
+    stages = [stage for stage in args.stages.split(",") if stage]
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        parser.error(f"unknown stages: {', '.join(sorted(unknown))}")
+    output = os.path.abspath(args.output)
+    baseline = os.path.abspath(args.baseline) if args.baseline else None
+
+    with StubServer(args.llm_latency) as stub, tempfile.TemporaryDirectory() as workdir:
+        os.environ["OPENAI_API_KEY"] = "benchmark"
+        os.environ["OPENAI_BASE_URL"] = stub.base_url
+        # Relative storage/ paths resolve inside the scratch directory
+        os.chdir(workdir)
+        results = asyncio.run(run_benchmarks(stages, levels, args.requests))
+        os.chdir(BACKEND_DIR)
+
+    from services.ai_processor import LLM_MAX_CONCURRENCY
+    from utils.worker_pool import WORKER_PROCESSES
+
+    report = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "requests": args.requests,
+            "concurrency": levels,
+            "llm_latency_s": args.llm_latency,
+            "llm_max_concurrency": LLM_MAX_CONCURRENCY,
+            "worker_processes": WORKER_PROCESSES,
+            "document_mix": [name for name, _, _ in DOCUMENT_MIX],
+        },
+        "results": results,
+    }
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {output}")
+
+    if baseline:
+        with open(baseline) as f:
+            sys.exit(check(report, json.load(f), args.threshold))
+
+
+if __name__ == "__main__":
+    main()
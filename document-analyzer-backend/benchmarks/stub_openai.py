@@ -0,0 +1,67 @@
+"""Minimal stand-in for the OpenAI chat completions endpoint.
+
+Run with ``python -m benchmarks.stub_openai`` and point the backend at it with
+``OPENAI_BASE_URL=http://127.0.0.1:8900/v1``.
+"""
+import argparse
+import asyncio
+import random
+import time
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+
+def create_stub_app(latency=0.5, jitter=0.0, error_rate=0.0):
+    app = FastAPI(title="OpenAI Stub")
+    app.state.requests = 0
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        app.state.requests += 1
+        await asyncio.sleep(max(0.0, latency + random.uniform(-jitter, jitter)))
+        if error_rate and random.random() < error_rate:
+            return JSONResponse(
+                {"error": {"message": "Rate limit reached", "type": "rate_limit"}},
+                status_code=429,
+                headers={"retry-after": "0.1"},
+            )
+        prompt = body["messages"][-1]["content"]
+        prompt_tokens = max(1, len(prompt) // 4)
+        content = f"Stub analysis of {len(prompt)} characters."
+        return {
+            "id": f"chatcmpl-stub-{app.state.requests}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "gpt-4"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": len(content) // 4,
+                "total_tokens": prompt_tokens + len(content) // 4,
+            },
+        }
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--latency", type=float, default=0.5, help="seconds per response")
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of 429 responses")
+    args = parser.parse_args()
+    app = create_stub_app(args.latency, args.jitter, args.error_rate)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
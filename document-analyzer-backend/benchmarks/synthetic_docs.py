@@ -0,0 +1,102 @@
+"""Deterministic synthetic PDF/DOCX/text documents for benchmarks."""
+import io
+import random
+
+from docx import Document
+
+WORDS = (
+    "shelter evacuation kennel crate volunteer veterinarian intake capacity route "
+    "livestock trailer feed water medication vaccination record owner contact "
+    "county coordinator transport quarantine boarding dogs cats horses emergency"
+).split()
+
+
+def make_lines(seed, count, words_per_line=12):
+    rng = random.Random(seed)
+    return [
+        f"{seed}-{index}: " + " ".join(rng.choice(WORDS) for _ in range(words_per_line))
+        for index in range(count)
+    ]
+
+
+def make_pages(seed, pages, lines_per_page=40):
+    return [make_lines(f"{seed}/{page}", lines_per_page) for page in range(pages)]
+
+
+def _escape_pdf_text(line):
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def make_pdf(seed, pages, lines_per_page=40):
+    """Return the bytes of a text-only PDF with the given number of pages."""
+    page_lines = make_pages(seed, pages, lines_per_page)
+    font_id = 3 + 2 * pages
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        "<< /Type /Pages /Kids [{}] /Count {} >>".format(
+            " ".join(f"{3 + 2 * page} 0 R" for page in range(pages)), pages
+        ),
+    ]
+    for page, lines in enumerate(page_lines):
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /CropBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 {font_id} 0 R >> >> /Contents {4 + 2 * page} 0 R >>"
+        )
+        text = " ".join(f"({_escape_pdf_text(line)}) '" for line in lines)
+        stream = f"BT /F1 9 Tf 11 TL 40 760 Td {text} ET"
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+    objects.append("<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("ascii")
+    out += b"".join(f"{offset:010d} 00000 n \n".encode("ascii") for offset in offsets)
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode("ascii")
+    return bytes(out)
+
+
+def make_docx(seed, paragraphs):
+    """Return the bytes of a DOCX with headings every ten paragraphs."""
+    doc = Document()
+    for index, line in enumerate(make_lines(seed, paragraphs, words_per_line=30)):
+        if index % 10 == 0:
+            doc.add_heading(f"Section {index // 10 + 1}", 1)
+        doc.add_paragraph(line)
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+
+def make_text(seed, pages):
+    return "\f".join("\n".join(lines) for lines in make_pages(seed, pages))
+
+
+def make_analysis(seed, sections):
+    """Model-style output used to benchmark DOCX rendering."""
+    parts = []
+    for section, lines in enumerate(make_pages(seed, sections, lines_per_page=6)):
+        parts.append(f"## Section {section + 1}")
+        parts.extend(f"- **Item {index}**: {line}" for index, line in enumerate(lines))
+        parts.append("")
+    return "\n".join(parts)
+
+
+# (name, kind, size) mix used by the benchmark; size is pages or paragraphs
+DOCUMENT_MIX = (
+    ("pdf-2p", "pdf", 2),
+    ("pdf-20p", "pdf", 20),
+    ("pdf-100p", "pdf", 100),
+    ("docx-20", "docx", 20),
+    ("docx-300", "docx", 300),
+)
+
+
+def make_document(seed, kind, size):
+    """Return (extension, bytes) for one synthetic document."""
+    if kind == "pdf":
+        return ".pdf", make_pdf(seed, size)
+    return ".docx", make_docx(seed, size)
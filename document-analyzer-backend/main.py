@@ -1,8 +1,42 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
-from api import routes_upload, routes_generate
+from api import routes_upload, routes_generate, routes_batch, routes_metrics
+from services import ai_processor
+from services.batch_pipeline import MAX_BATCH_BYTES, MAX_BATCH_FILES
+from services.document_parser import MAX_UPLOAD_SIZE
+from services.job_queue import job_queue
+from utils.metrics import MetricsMiddleware
+from utils.profiling import PROFILING_ENABLED, ProfilingMiddleware
+from utils.request_limits import MULTIPART_OVERHEAD, BodySizeLimitMiddleware
+from utils.worker_pool import shutdown_process_pool
+
+
+@asynccontextmanager
+async def lifespan(app):
+    await ai_processor.start_client()
+    await job_queue.start()
+    yield
+    await job_queue.stop()
+    await ai_processor.stop_client()
+    shutdown_process_pool()
+
 
-app = FastAPI(title="Document Analyzer API")
+app = FastAPI(title="Document Analyzer API", lifespan=lifespan)
+app.add_middleware(
+    BodySizeLimitMiddleware,
+    limits={
+        "/api/upload": MAX_UPLOAD_SIZE + MULTIPART_OVERHEAD,
+        # Extra room for one set of part headers per file
+        "/api/batch": MAX_BATCH_BYTES + MULTIPART_OVERHEAD + MAX_BATCH_FILES * 1024,
+    },
+)
+app.add_middleware(MetricsMiddleware)
+if PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
 
 # Register API Routes
 app.include_router(routes_upload.router, prefix="/api/upload")
 app.include_router(routes_generate.router, prefix="/api/generate")
+app.include_router(routes_batch.router, prefix="/api/batch")
+app.include_router(routes_metrics.router)
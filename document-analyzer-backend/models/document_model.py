@@ -0,0 +1,14 @@
+from pydantic import BaseModel
+
+
+class StoredFile(BaseModel):
+    filename: str
+    path: str
+    sha256: str
+    size: int
+
+
+class GenerateJobRequest(BaseModel):
+    path: str
+    # Higher priorities are processed first
+    priority: int = 0
@@ -1,24 +1,229 @@
-import openai
+import asyncio
 import os
+import random
+import time
+
+import httpx
 from dotenv import load_dotenv
+from openai import APIConnectionError, APIStatusError, AsyncOpenAI
+
+from services.chunker import CHARS_PER_TOKEN, CHUNK_MAX_TOKENS, chunk_text, estimate_tokens
+from services.document_parser import PAGE_SEPARATOR
+from services.result_cache import analysis_cache, make_key
+from utils.metrics import (
+    analysis_duration,
+    llm_cost,
+    llm_request_duration,
+    llm_requests_in_flight,
+    llm_retries,
+    llm_tokens,
+)
 
 # Load environment variables from .env file
 load_dotenv()
 
 # Get API key from environment variables
-openai.api_key = os.getenv("OPENAI_API_KEY")
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+# Override to point the client at a local stub server (e.g. for load testing)
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL")
+OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4")
 
-async def analyze_document(text):
-    # Check if API key is set
-    if not openai.api_key:
-        raise ValueError("OPENAI_API_KEY environment variable is not set")
-        
-    prompt = f"""Extract important details for animal emergency planning from the following text:
+# Max number of in-flight LLM calls per worker process
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "60"))
+LLM_CONNECT_TIMEOUT = float(os.getenv("LLM_CONNECT_TIMEOUT", "5"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))
+LLM_BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE", "0.5"))
+LLM_BACKOFF_MAX = float(os.getenv("LLM_BACKOFF_MAX", "20"))
+
+# USD per 1K tokens, used for the cost counter (defaults: GPT-4 8K list price)
+LLM_PROMPT_COST_PER_1K = float(os.getenv("LLM_PROMPT_COST_PER_1K", "0.03"))
+LLM_COMPLETION_COST_PER_1K = float(os.getenv("LLM_COMPLETION_COST_PER_1K", "0.06"))
+
+PROMPT_TEMPLATE = """Extract important details for animal emergency planning from the following text:
 
     {text}
     """
-    response = openai.ChatCompletion.create(
-        model="gpt-4",
-        messages=[{"role": "user", "content": prompt}]
+
+# Used per chunk when a document is too long for a single request
+MAP_PROMPT_TEMPLATE = """Extract important details for animal emergency planning from the following excerpt of a longer document.
+Only report details stated in the excerpt; reply with "None" if there are none.
+
+    {text}
+    """
+
+REDUCE_PROMPT_TEMPLATE = """The following are details for animal emergency planning extracted from consecutive parts of one document.
+Merge them into a single answer, removing duplicates and ignoring parts that report "None":
+
+    {text}
+    """
+
+TRUNCATION_MARKER = "\n[truncated]"
+PARTIAL_SEPARATOR = "\n\n---\n\n"
+
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+_client = None
+_semaphore = None
+
+
+async def start_client():
+    """Create the shared AsyncOpenAI client and its httpx connection pool."""
+    global _client, _semaphore
+    # Without a key the app still starts; analyze_document reports the error
+    if _client is not None or not OPENAI_API_KEY:
+        return _client
+    http_client = httpx.AsyncClient(
+        timeout=httpx.Timeout(LLM_TIMEOUT, connect=LLM_CONNECT_TIMEOUT),
+        limits=httpx.Limits(
+            max_connections=LLM_MAX_CONCURRENCY,
+            max_keepalive_connections=LLM_MAX_CONCURRENCY,
+        ),
+    )
+    # Retries are handled below so backoff happens outside the concurrency slot
+    _client = AsyncOpenAI(
+        api_key=OPENAI_API_KEY,
+        base_url=OPENAI_BASE_URL,
+        http_client=http_client,
+        max_retries=0,
     )
-    return response.choices[0].message.content
+    _semaphore = asyncio.Semaphore(LLM_MAX_CONCURRENCY)
+    return _client
+
+
+async def stop_client():
+    """Close the shared client and release pooled connections."""
+    global _client, _semaphore
+    if _client is not None:
+        await _client.close()
+    _client = None
+    _semaphore = None
+
+
+def _retry_delay(attempt, error):
+    # Honour Retry-After from rate limit responses when the server sends one
+    if isinstance(error, APIStatusError):
+        retry_after = error.response.headers.get("retry-after")
+        if retry_after:
+            try:
+                return min(float(retry_after), LLM_BACKOFF_MAX)
+            except ValueError:
+                pass
+    delay = min(LLM_BACKOFF_BASE * (2 ** attempt), LLM_BACKOFF_MAX)
+    return delay * random.uniform(0.5, 1.0)
+
+
+def _is_retryable(error):
+    if isinstance(error, APIStatusError):
+        return error.status_code in RETRYABLE_STATUS_CODES
+    # Covers connection failures and timeouts
+    return isinstance(error, APIConnectionError)
+
+
+def _record_usage(model, usage):
+    if usage is None:
+        return
+    llm_tokens.inc(usage.prompt_tokens, model=model, type="prompt")
+    llm_tokens.inc(usage.completion_tokens, model=model, type="completion")
+    llm_cost.inc(
+        usage.prompt_tokens / 1000 * LLM_PROMPT_COST_PER_1K
+        + usage.completion_tokens / 1000 * LLM_COMPLETION_COST_PER_1K,
+        model=model,
+    )
+
+
+async def chat_completion(prompt, model=OPENAI_MODEL):
+    client = await start_client()
+    if client is None:
+        raise ValueError("OPENAI_API_KEY environment variable is not set")
+    for attempt in range(LLM_MAX_RETRIES + 1):
+        try:
+            async with _semaphore:
+                start = time.perf_counter()
+                outcome = "error"
+                with llm_requests_in_flight.track_inprogress():
+                    try:
+                        response = await client.chat.completions.create(
+                            model=model,
+                            messages=[{"role": "user", "content": prompt}],
+                        )
+                        outcome = "ok"
+                    finally:
+                        llm_request_duration.observe(time.perf_counter() - start, model=model, outcome=outcome)
+            _record_usage(model, response.usage)
+            return response.choices[0].message.content
+        except (APIStatusError, APIConnectionError) as error:
+            if attempt == LLM_MAX_RETRIES or not _is_retryable(error):
+                raise
+            llm_retries.inc(model=model)
+            await asyncio.sleep(_retry_delay(attempt, error))
+
+
+def normalize_text(text):
+    # Whitespace-only differences shouldn't cause a cache miss
+    return PAGE_SEPARATOR.join(
+        "\n".join(" ".join(line.split()) for line in page.strip().split("\n"))
+        for page in text.split(PAGE_SEPARATOR)
+    )
+
+
+async def _cached_completion(template, text):
+    key = make_key(text, template, OPENAI_MODEL)
+    prompt = template.format(text=text)
+    return await analysis_cache.get_or_compute(key, lambda: chat_completion(prompt))
+
+
+def _group_partials(partials, max_tokens):
+    groups = [[]]
+    size = 0
+    for partial in partials:
+        tokens = estimate_tokens(partial)
+        if groups[-1] and size + tokens > max_tokens:
+            groups.append([])
+            size = 0
+        groups[-1].append(partial)
+        size += tokens
+    return groups
+
+
+def _truncate(text, max_tokens):
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= max_chars:
+        return text
+    return text[:max_chars - len(TRUNCATION_MARKER)] + TRUNCATION_MARKER
+
+
+async def _reduce(partials, max_tokens=CHUNK_MAX_TOKENS):
+    # Merge level by level until everything fits in one request. Capping each
+    # partial at half the budget guarantees any two fit in one group, so every
+    # level at least halves the number of partials.
+    while True:
+        partials = [_truncate(partial, max_tokens // 2) for partial in partials]
+        groups = _group_partials(partials, max_tokens)
+        if len(groups) == 1:
+            return await _cached_completion(REDUCE_PROMPT_TEMPLATE, PARTIAL_SEPARATOR.join(partials))
+        partials = await asyncio.gather(*(
+            _cached_completion(REDUCE_PROMPT_TEMPLATE, PARTIAL_SEPARATOR.join(group))
+            for group in groups
+        ))
+
+
+async def analyze_document(text):
+    # Check if API key is set
+    if not OPENAI_API_KEY:
+        raise ValueError("OPENAI_API_KEY environment variable is not set")
+
+    with analysis_duration.time():
+        return await _analyze(text)
+
+
+async def _analyze(text):
+    chunks = chunk_text(normalize_text(text))
+    if len(chunks) <= 1:
+        return await _cached_completion(PROMPT_TEMPLATE, chunks[0] if chunks else "")
+
+    # Map: chunk calls run concurrently, bounded by LLM_MAX_CONCURRENCY
+    partials = await asyncio.gather(*(
+        _cached_completion(MAP_PROMPT_TEMPLATE, chunk) for chunk in chunks
+    ))
+    return await _reduce(partials)
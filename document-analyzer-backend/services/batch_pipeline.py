@@ -0,0 +1,187 @@
+import asyncio
+import os
+import shutil
+import uuid
+from typing import NamedTuple
+
+from services.ai_processor import LLM_MAX_CONCURRENCY, analyze_document
+from services.document_parser import (
+    UPLOAD_DIR,
+    BudgetExceededError,
+    ByteBudget,
+    extract_text,
+    save_upload_file,
+    save_zip_members,
+)
+from services.output_formatter import create_docx_async
+from utils.file_storage import remove_quietly
+from utils.worker_pool import WORKER_PROCESSES
+
+BATCH_UPLOAD_DIR = f"{UPLOAD_DIR}/batches"
+MAX_BATCH_FILES = int(os.getenv("MAX_BATCH_FILES", "500"))
+# Total bytes a batch may store, counting unpacked zip members
+MAX_BATCH_BYTES = int(os.getenv("MAX_BATCH_BYTES", str(1024 * 1024 * 1024)))
+# Max documents waiting between two stages
+BATCH_QUEUE_SIZE = int(os.getenv("BATCH_QUEUE_SIZE", "16"))
+BATCH_SAVE_CONCURRENCY = int(os.getenv("BATCH_SAVE_CONCURRENCY", "4"))
+BATCH_EXTRACT_CONCURRENCY = int(os.getenv("BATCH_EXTRACT_CONCURRENCY", str(WORKER_PROCESSES)))
+BATCH_ANALYZE_CONCURRENCY = int(os.getenv("BATCH_ANALYZE_CONCURRENCY", str(LLM_MAX_CONCURRENCY)))
+BATCH_FORMAT_CONCURRENCY = int(os.getenv("BATCH_FORMAT_CONCURRENCY", "2"))
+
+
+class Stage(NamedTuple):
+    name: str
+    handler: object
+    concurrency: int
+
+
+def _event(document, stage, status, **fields):
+    return {
+        "index": document["index"],
+        "filename": document["filename"],
+        "stage": stage,
+        "status": status,
+        **fields,
+    }
+
+
+async def save_batch(files, batch_id):
+    """Store uploaded files, unpacking zip archives, with bounded concurrency.
+
+    Runs before the response starts streaming because FastAPI closes the
+    uploaded files once the endpoint returns. Raises ValueError, after
+    removing everything stored for the batch, when it exceeds
+    MAX_BATCH_BYTES or MAX_BATCH_FILES.
+    """
+    try:
+        return await _save_batch(files, f"{BATCH_UPLOAD_DIR}/{batch_id}")
+    except BaseException:
+        remove_batch(batch_id)
+        raise
+
+
+def remove_batch(batch_id):
+    """Delete the stored uploads of a batch; its reports are kept."""
+    shutil.rmtree(f"{BATCH_UPLOAD_DIR}/{batch_id}", ignore_errors=True)
+
+
+async def _save_batch(files, upload_dir):
+    semaphore = asyncio.Semaphore(BATCH_SAVE_CONCURRENCY)
+    budget = ByteBudget(MAX_BATCH_BYTES)
+
+    async def save(position, file):
+        async with semaphore:
+            filename = os.path.basename(file.filename or "") or "upload"
+            stored = await save_upload_file(file, upload_dir=upload_dir, filename=f"{position:04d}_{filename}")
+            if not stored.filename.lower().endswith(".zip"):
+                budget.consume(stored.size)
+                return [(file.filename, stored)]
+            members_dir = f"{upload_dir}/{position:04d}"
+            try:
+                members = await save_zip_members(stored.path, members_dir, max_files=MAX_BATCH_FILES, budget=budget)
+            finally:
+                remove_quietly(stored.path)
+            return [(member.filename, member) for member in members]
+
+    results = await asyncio.gather(
+        *(save(position, file) for position, file in enumerate(files)),
+        return_exceptions=True,
+    )
+    if budget.exceeded or any(isinstance(result, BudgetExceededError) for result in results):
+        raise ValueError(f"Batch exceeds the {MAX_BATCH_BYTES} byte limit")
+    documents = []
+    events = []
+    index = 0
+    for file, result in zip(files, results):
+        if isinstance(result, BaseException):
+            document = {"index": index, "filename": file.filename}
+            events.append(_event(document, "saved", "failed", error=str(result) or type(result).__name__))
+            index += 1
+            continue
+        for filename, stored in result:
+            document = {
+                "index": index,
+                "id": uuid.uuid4().hex,
+                "filename": filename,
+                "path": stored.path,
+                "sha256": stored.sha256,
+                "size": stored.size,
+            }
+            documents.append(document)
+            events.append(_event(document, "saved", "ok", size=stored.size, sha256=stored.sha256))
+            index += 1
+    if len(documents) > MAX_BATCH_FILES:
+        raise ValueError(f"Batch contains more than {MAX_BATCH_FILES} documents")
+    return documents, events
+
+
+async def _extract(document):
+    document["text"] = await extract_text(document["path"], document["sha256"])
+
+
+async def _analyze(document):
+    document["analysis"] = await analyze_document(document.pop("text"))
+
+
+async def _format(document):
+    document["output_path"] = await create_docx_async(document.pop("analysis"), document["id"])
+
+
+def analysis_stages():
+    return [
+        Stage("extracted", _extract, BATCH_EXTRACT_CONCURRENCY),
+        Stage("analyzed", _analyze, BATCH_ANALYZE_CONCURRENCY),
+        Stage("formatted", _format, BATCH_FORMAT_CONCURRENCY),
+    ]
+
+
+async def run_pipeline(documents, stages, queue_size=BATCH_QUEUE_SIZE):
+    """Push documents through stages connected by bounded queues.
+
+    Yields a progress event whenever a document finishes a stage, and a
+    final "done" or "failed" event per document.
+    """
+    queues = [asyncio.Queue(maxsize=queue_size) for _ in stages]
+    events = asyncio.Queue()
+
+    async def feed():
+        for document in documents:
+            await queues[0].put(document)
+        for _ in range(stages[0].concurrency):
+            await queues[0].put(None)
+
+    async def worker(position, stage):
+        inbox = queues[position]
+        outbox = queues[position + 1] if position + 1 < len(stages) else None
+        while (document := await inbox.get()) is not None:
+            try:
+                await stage.handler(document)
+            except Exception as e:
+                await events.put(_event(document, stage.name, "failed", error=str(e) or type(e).__name__))
+                continue
+            await events.put(_event(document, stage.name, "ok"))
+            if outbox is not None:
+                await outbox.put(document)
+            else:
+                await events.put(_event(document, "done", "ok", document_id=document["id"]))
+
+    async def run_stage(position, stage):
+        await asyncio.gather(*(worker(position, stage) for _ in range(stage.concurrency)))
+        # One sentinel per downstream worker once this stage has drained
+        if position + 1 < len(stages):
+            for _ in range(stages[position + 1].concurrency):
+                await queues[position + 1].put(None)
+
+    tasks = [asyncio.create_task(run_stage(position, stage)) for position, stage in enumerate(stages)]
+    tasks.append(asyncio.create_task(feed()))
+    done = asyncio.gather(*tasks)
+    done.add_done_callback(lambda _: events.put_nowait(None))
+    try:
+        while (event := await events.get()) is not None:
+            yield event
+        await done
+    finally:
+        # Stop the pipeline if the consumer goes away (e.g. client disconnect)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,93 @@
+import os
+import re
+import zlib
+
+from services.document_parser import PAGE_SEPARATOR
+
+# Rough GPT tokenizer ratio for English prose; avoids a tokenizer dependency
+CHARS_PER_TOKEN = 4
+CHUNK_MAX_TOKENS = int(os.getenv("CHUNK_MAX_TOKENS", "3000"))
+CHUNK_OVERLAP_TOKENS = int(os.getenv("CHUNK_OVERLAP_TOKENS", "150"))
+# Once a chunk holds this share of the max, a content-defined boundary may close it
+CHUNK_MIN_FILL = 0.5
+# Roughly one in BOUNDARY_MODULUS sections is a content-defined boundary
+BOUNDARY_MODULUS = 4
+
+SECTION_BREAK = re.compile(r"\n\s*\n")
+
+
+def estimate_tokens(text):
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def _split_oversized(section, max_tokens):
+    # Fall back to line and then character boundaries for huge sections
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    piece = ""
+    for line in section.split("\n"):
+        while len(line) > max_chars:
+            if piece:
+                yield piece
+                piece = ""
+            yield line[:max_chars]
+            line = line[max_chars:]
+        if piece and len(piece) + 1 + len(line) > max_chars:
+            yield piece
+            piece = ""
+        piece = f"{piece}\n{line}" if piece else line
+    if piece:
+        yield piece
+
+
+def split_sections(text, max_tokens=CHUNK_MAX_TOKENS):
+    """Split text on page and blank-line boundaries into pieces under max_tokens."""
+    for page in text.split(PAGE_SEPARATOR):
+        for section in SECTION_BREAK.split(page):
+            section = section.strip()
+            if not section:
+                continue
+            if estimate_tokens(section) <= max_tokens:
+                yield section
+            else:
+                yield from _split_oversized(section, max_tokens)
+
+
+def _is_boundary(section):
+    # Boundaries depend on section content rather than position, so editing
+    # one section only moves chunk boundaries until the next boundary section
+    return zlib.crc32(section.encode("utf-8")) % BOUNDARY_MODULUS == 0
+
+
+def chunk_text(text, max_tokens=CHUNK_MAX_TOKENS, overlap_tokens=CHUNK_OVERLAP_TOKENS):
+    """Group sections into chunks of at most max_tokens plus overlap_tokens of
+    trailing context carried over from the previous chunk."""
+    chunks = []
+    current = []
+    current_tokens = 0
+    previous = []
+
+    def close_chunk():
+        nonlocal current, current_tokens, previous
+        overlap = []
+        overlap_size = 0
+        for section in reversed(previous):
+            overlap_size += estimate_tokens(section)
+            if overlap_size > overlap_tokens:
+                break
+            overlap.insert(0, section)
+        chunks.append("\n\n".join(overlap + current))
+        previous = current
+        current = []
+        current_tokens = 0
+
+    for section in split_sections(text, max_tokens):
+        tokens = estimate_tokens(section)
+        if current and current_tokens + tokens > max_tokens:
+            close_chunk()
+        elif current and current_tokens >= max_tokens * CHUNK_MIN_FILL and _is_boundary(section):
+            close_chunk()
+        current.append(section)
+        current_tokens += tokens
+    if current:
+        close_chunk()
+    return chunks
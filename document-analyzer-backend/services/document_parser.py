@@ -1,12 +1,328 @@
+import asyncio
+import hashlib
 import os
+import re
+import threading
+import time
+import zipfile
+from collections import deque
+from itertools import islice
+
 from aiofiles import open as aio_open
 
+from models.document_model import StoredFile
+from utils.file_storage import CHUNK_SIZE, hash_file, remove_quietly, temp_path_for
+from utils.metrics import extracted_pages, extraction_duration, upload_bytes, upload_duration
+from utils.worker_pool import WORKER_PROCESSES, get_process_pool
+
 UPLOAD_DIR = "storage/uploads"
+MAX_UPLOAD_SIZE = int(os.getenv("MAX_UPLOAD_SIZE", str(100 * 1024 * 1024)))
+
+EXTRACT_DIR = "storage/extracted"
+SUPPORTED_EXTENSIONS = {".pdf", ".docx", ".txt"}
+# Pages are separated by form feeds in extracted text and in the on-disk cache
+PAGE_SEPARATOR = "\f"
+PAGES_PER_TASK = int(os.getenv("EXTRACT_PAGES_PER_TASK", "8"))
+MAX_PENDING_TASKS = WORKER_PROCESSES * 2
+# Pages where pypdfium2 finds fewer characters are re-read with pdfplumber
+MIN_PAGE_CHARS = int(os.getenv("EXTRACT_MIN_PAGE_CHARS", "20"))
+SHA256_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+# Uploads are stored as "<sha256>_<original name>"
+STORED_NAME_PREFIX = re.compile(r"^[0-9a-f]{64}_")
+
+
+def original_filename(path):
+    """Return the name a stored upload was uploaded with."""
+    return STORED_NAME_PREFIX.sub("", os.path.basename(path), count=1)
+
+
+class FileTooLargeError(ValueError):
+    pass
+
+
+class BudgetExceededError(FileTooLargeError):
+    pass
+
+
+class ByteBudget:
+    """Byte allowance shared by concurrent saves, including from threads."""
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.used = 0
+        self._lock = threading.Lock()
+
+    @property
+    def exceeded(self):
+        return self.used > self.limit
+
+    def consume(self, amount):
+        with self._lock:
+            self.used += amount
+            if self.used > self.limit:
+                raise BudgetExceededError(f"Batch exceeds the {self.limit} byte limit")
+
+
+async def save_upload_file(file, max_size=MAX_UPLOAD_SIZE, upload_dir=UPLOAD_DIR, filename=None):
+    # HTTP uploads are also capped before parsing by BodySizeLimitMiddleware
+    if file.size is not None and file.size > max_size:
+        raise FileTooLargeError(f"File exceeds the {max_size} byte upload limit")
+
+    os.makedirs(upload_dir, exist_ok=True)
+    filename = os.path.basename(filename or file.filename or "") or "upload"
+    temp_path = temp_path_for(f"{upload_dir}/{filename}")
+    digest = hashlib.sha256()
+    size = 0
+    start = time.perf_counter()
+    try:
+        async with aio_open(temp_path, 'wb') as out_file:
+            while chunk := await file.read(CHUNK_SIZE):
+                size += len(chunk)
+                if size > max_size:
+                    raise FileTooLargeError(f"File exceeds the {max_size} byte upload limit")
+                digest.update(chunk)
+                await out_file.write(chunk)
+        # Hash-prefixed name: same-named uploads never overwrite each other,
+        # and a stored path always matches the sha256 returned with it
+        file_path = f"{upload_dir}/{digest.hexdigest()}_{filename}"
+        os.replace(temp_path, file_path)
+    except BaseException:
+        remove_quietly(temp_path)
+        raise
+    upload_duration.observe(time.perf_counter() - start)
+    upload_bytes.inc(size)
+    return StoredFile(filename=filename, path=file_path, sha256=digest.hexdigest(), size=size)
+
+
+def _save_zip_members(zip_path, upload_dir, max_size, max_files, budget):
+    stored = []
+    with zipfile.ZipFile(zip_path) as archive:
+        for info in archive.infolist():
+            filename = os.path.basename(info.filename)
+            # Skip folders and OS metadata such as __MACOSX/ and ._ resource forks
+            if info.is_dir() or not filename or filename.startswith(".") or info.filename.startswith("__MACOSX/"):
+                continue
+            if len(stored) >= max_files:
+                raise ValueError(f"Archive contains more than {max_files} files")
+            if info.file_size > max_size:
+                raise FileTooLargeError(f"{filename} exceeds the {max_size} byte upload limit")
+            # Index prefix keeps same-named files from different folders apart
+            file_path = f"{upload_dir}/{len(stored):04d}_{filename}"
+            temp_path = temp_path_for(file_path)
+            digest = hashlib.sha256()
+            size = 0
+            try:
+                with archive.open(info) as source, open(temp_path, "wb") as out_file:
+                    while chunk := source.read(CHUNK_SIZE):
+                        size += len(chunk)
+                        # file_size comes from the archive and can't be trusted alone
+                        if size > max_size:
+                            raise FileTooLargeError(f"{filename} exceeds the {max_size} byte upload limit")
+                        if budget is not None:
+                            budget.consume(len(chunk))
+                        digest.update(chunk)
+                        out_file.write(chunk)
+                os.replace(temp_path, file_path)
+            except BaseException:
+                remove_quietly(temp_path)
+                raise
+            stored.append(StoredFile(filename=filename, path=file_path, sha256=digest.hexdigest(), size=size))
+    return stored
+
+
+async def save_zip_members(zip_path, upload_dir=UPLOAD_DIR, max_size=MAX_UPLOAD_SIZE, max_files=1000, budget=None):
+    """Unpack a stored zip archive into upload_dir, one StoredFile per member.
+
+    Uncompressed bytes are charged to budget (a ByteBudget) when given.
+    """
+    os.makedirs(upload_dir, exist_ok=True)
+    try:
+        return await asyncio.to_thread(_save_zip_members, zip_path, upload_dir, max_size, max_files, budget)
+    except zipfile.BadZipFile as e:
+        raise ValueError(f"Invalid zip archive: {e}")
+
+
+class UnsupportedFileTypeError(ValueError):
+    pass
+
+
+class DocumentParseError(ValueError):
+    pass
+
+
+def _parse_errors():
+    # Imported lazily like the parsers themselves; only needed once something failed
+    import pypdfium2 as pdfium
+    from docx.opc.exceptions import OpcError
+    from lxml.etree import XMLSyntaxError
+    from pdfplumber.utils.exceptions import MalformedPDFException, PdfminerException
+
+    return (
+        pdfium.PdfiumError,
+        OpcError,
+        XMLSyntaxError,
+        zipfile.BadZipFile,
+        MalformedPDFException,
+        PdfminerException,
+    )
+
+
+def _extract_pdf_pages(path, start, stop):
+    # Runs in a worker process; each task opens its own handles since
+    # pdfium/pdfplumber documents can't be shared across processes
+    import pdfplumber
+    import pypdfium2 as pdfium
+
+    pages = []
+    pdf = pdfium.PdfDocument(path)
+    plumber = None
+    try:
+        for index in range(start, stop):
+            page = pdf[index]
+            textpage = page.get_textpage()
+            text = textpage.get_text_bounded()
+            textpage.close()
+            page.close()
+            # Sparse pdfium output usually means an unusual layout; let pdfplumber try
+            if len(text.strip()) < MIN_PAGE_CHARS:
+                if plumber is None:
+                    plumber = pdfplumber.open(path)
+                plumber_page = plumber.pages[index]
+                layout_text = plumber_page.extract_text(layout=True) or ""
+                plumber_page.close()
+                # Layout mode pads to the page width; keep the line structure only
+                layout_text = "\n".join(line.rstrip() for line in layout_text.splitlines()).strip("\n")
+                text = layout_text or text
+            pages.append(text.replace(PAGE_SEPARATOR, "\n"))
+    finally:
+        if plumber is not None:
+            plumber.close()
+        pdf.close()
+    return pages
+
+
+def _count_pdf_pages(path):
+    import pypdfium2 as pdfium
+
+    pdf = pdfium.PdfDocument(path)
+    try:
+        return len(pdf)
+    finally:
+        pdf.close()
+
+
+def _extract_docx_text(path):
+    from docx import Document
+
+    doc = Document(path)
+    lines = [paragraph.text for paragraph in doc.paragraphs]
+    for table in doc.tables:
+        for row in table.rows:
+            lines.append(" | ".join(cell.text for cell in row.cells))
+    return "\n".join(lines)
+
+
+def _read_text_file(path):
+    with open(path, encoding="utf-8", errors="replace") as f:
+        return f.read()
+
+
+async def _iter_pdf_pages(path):
+    loop = asyncio.get_running_loop()
+    pool = get_process_pool()
+    page_count = await loop.run_in_executor(pool, _count_pdf_pages, path)
+    ranges = [
+        (start, min(start + PAGES_PER_TASK, page_count))
+        for start in range(0, page_count, PAGES_PER_TASK)
+    ]
+    # Keep a bounded window of page ranges in flight so memory stays flat
+    pending = deque()
+    next_range = iter(ranges)
+    try:
+        for start, stop in islice(next_range, MAX_PENDING_TASKS):
+            pending.append(loop.run_in_executor(pool, _extract_pdf_pages, path, start, stop))
+        while pending:
+            pages = await pending.popleft()
+            for start, stop in islice(next_range, 1):
+                pending.append(loop.run_in_executor(pool, _extract_pdf_pages, path, start, stop))
+            for page in pages:
+                yield page
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+async def _iter_cached_pages(cache_path):
+    buffer = ""
+    async with aio_open(cache_path, "r", encoding="utf-8", newline="") as f:
+        while chunk := await f.read(CHUNK_SIZE):
+            buffer += chunk
+            *pages, buffer = buffer.split(PAGE_SEPARATOR)
+            for page in pages:
+                yield page
+    yield buffer
+
+
+async def _single_page(reader, path):
+    text = await asyncio.to_thread(reader, path)
+    yield text.replace(PAGE_SEPARATOR, "\n")
+
+
+async def iter_document_pages(path, sha256=None):
+    """Yield the text of each page of a stored upload, in order.
+
+    Results are cached under EXTRACT_DIR keyed by the file's SHA-256. Only
+    pass sha256 when it was computed server-side while storing this exact
+    file; otherwise it is hashed here. Raises DocumentParseError for
+    corrupt, encrypted or otherwise unreadable documents.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in SUPPORTED_EXTENSIONS:
+        raise UnsupportedFileTypeError(f"Unsupported file type: {extension or path}")
+
+    start = time.perf_counter()
+    if sha256 is None:
+        sha256 = await asyncio.to_thread(hash_file, path)
+    elif not SHA256_PATTERN.match(sha256):
+        raise ValueError("sha256 must be 64 lowercase hex characters")
+    cache_path = f"{EXTRACT_DIR}/{sha256}.txt"
+    if os.path.exists(cache_path):
+        async for page in _iter_cached_pages(cache_path):
+            extracted_pages.inc(source="cache")
+            yield page
+        extraction_duration.observe(time.perf_counter() - start, source="cache")
+        return
+
+    source = extension.lstrip(".")
+
+    if extension == ".pdf":
+        pages = _iter_pdf_pages(path)
+    else:
+        reader = _extract_docx_text if extension == ".docx" else _read_text_file
+        pages = _single_page(reader, path)
+
+    os.makedirs(EXTRACT_DIR, exist_ok=True)
+    temp_path = temp_path_for(cache_path)
+    try:
+        async with aio_open(temp_path, "w", encoding="utf-8", newline="") as cache_file:
+            first = True
+            async for page in pages:
+                if not first:
+                    await cache_file.write(PAGE_SEPARATOR)
+                first = False
+                await cache_file.write(page)
+                extracted_pages.inc(source=source)
+                yield page
+        os.replace(temp_path, cache_path)
+        extraction_duration.observe(time.perf_counter() - start, source=source)
+    except _parse_errors() as e:
+        # The parsers' messages include server paths, so keep them out of the error
+        raise DocumentParseError(f"Could not read {source.upper()} document; it may be corrupt or encrypted") from e
+    finally:
+        await pages.aclose()
+        remove_quietly(temp_path)
+
 
-async def save_upload_file(file):
-    os.makedirs(UPLOAD_DIR, exist_ok=True)
-    file_path = f"{UPLOAD_DIR}/{file.filename}"
-    async with aio_open(file_path, 'wb') as out_file:
-        content = await file.read()
-        await out_file.write(content)
-    return file_path
+async def extract_text(path, sha256=None):
+    pages = [page async for page in iter_document_pages(path, sha256)]
+    return PAGE_SEPARATOR.join(pages)
@@ -0,0 +1,207 @@
+import asyncio
+import itertools
+import logging
+import os
+import sqlite3
+import time
+import uuid
+
+from services.ai_processor import analyze_document
+from services.document_parser import extract_text
+from services.output_formatter import create_docx_async
+from utils.metrics import Gauge, jobs_finished
+
+logger = logging.getLogger(__name__)
+
+JOBS_DB_PATH = "storage/jobs/jobs.sqlite3"
+# Number of jobs processed at the same time
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+
+STATUS_QUEUED = "queued"
+STATUS_RUNNING = "running"
+STATUS_SUCCEEDED = "succeeded"
+STATUS_FAILED = "failed"
+
+
+async def run_generate_job(job):
+    input_text = await extract_text(job["input_path"])
+    extracted_text = await analyze_document(input_text)
+    # Per-job output name so concurrent jobs never overwrite each other
+    return await create_docx_async(extracted_text, job["id"])
+
+
+class JobQueue:
+    """Priority job queue persisted in SQLite and drained by a worker pool.
+
+    Jobs left queued or running when the process stops are picked up again
+    on the next start().
+    """
+
+    def __init__(self, db_path=JOBS_DB_PATH, workers=JOB_WORKERS, handler=run_generate_job):
+        self.db_path = db_path
+        self.workers = workers
+        self.handler = handler
+        self._queue = None
+        self._tasks = []
+        # Tie-breaker so equal priorities run in submission order
+        self._sequence = itertools.count()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _init_db(self):
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute(
+                    """CREATE TABLE IF NOT EXISTS jobs (
+                        id TEXT PRIMARY KEY,
+                        status TEXT NOT NULL,
+                        priority INTEGER NOT NULL,
+                        input_path TEXT NOT NULL,
+                        output_path TEXT,
+                        error TEXT,
+                        created_at REAL NOT NULL,
+                        started_at REAL,
+                        finished_at REAL
+                    )"""
+                )
+                # Jobs interrupted by a shutdown or crash start over
+                conn.execute(
+                    "UPDATE jobs SET status = ?, started_at = NULL WHERE status = ?",
+                    (STATUS_QUEUED, STATUS_RUNNING),
+                )
+                rows = conn.execute(
+                    "SELECT id, priority FROM jobs WHERE status = ? ORDER BY created_at",
+                    (STATUS_QUEUED,),
+                ).fetchall()
+            return [(row["id"], row["priority"]) for row in rows]
+        finally:
+            conn.close()
+
+    def _insert(self, job):
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute(
+                    """INSERT INTO jobs (id, status, priority, input_path, created_at)
+                    VALUES (:id, :status, :priority, :input_path, :created_at)""",
+                    job,
+                )
+        finally:
+            conn.close()
+
+    def _update(self, job_id, **fields):
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute(
+                    f"UPDATE jobs SET {assignments} WHERE id = ?",
+                    (*fields.values(), job_id),
+                )
+        finally:
+            conn.close()
+
+    def _fetch(self, job_id):
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            return dict(row) if row is not None else None
+        finally:
+            conn.close()
+
+    def _enqueue(self, job_id, priority):
+        # PriorityQueue pops the smallest item, so negate to run high priorities first
+        self._queue.put_nowait((-priority, next(self._sequence), job_id))
+
+    async def start(self):
+        if self._queue is not None:
+            return
+        self._queue = asyncio.PriorityQueue()
+        for job_id, priority in await asyncio.to_thread(self._init_db):
+            self._enqueue(job_id, priority)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+
+    async def submit(self, input_path, priority=0):
+        if self._queue is None:
+            raise RuntimeError("JobQueue.start() must be called before submit()")
+        job = {
+            "id": uuid.uuid4().hex,
+            "status": STATUS_QUEUED,
+            "priority": priority,
+            "input_path": input_path,
+            "created_at": time.time(),
+        }
+        await asyncio.to_thread(self._insert, job)
+        self._enqueue(job["id"], priority)
+        return await self.get(job["id"])
+
+    async def get(self, job_id):
+        return await asyncio.to_thread(self._fetch, job_id)
+
+    async def _worker(self):
+        while True:
+            _, _, job_id = await self._queue.get()
+            try:
+                await self._run(job_id)
+            except asyncio.CancelledError:
+                # Only stop() cancels workers; any other cancellation is a job failure
+                if asyncio.current_task().cancelling():
+                    raise
+                logger.error("Job %s was cancelled unexpectedly", job_id)
+                await self._mark_failed(job_id, "Cancelled")
+            except Exception as e:
+                # e.g. SQLite "database is locked"; keep the worker alive
+                logger.exception("Job %s failed outside its handler", job_id)
+                await self._mark_failed(job_id, str(e) or type(e).__name__)
+            finally:
+                self._queue.task_done()
+
+    async def _mark_failed(self, job_id, error):
+        try:
+            await asyncio.to_thread(
+                self._update, job_id, status=STATUS_FAILED, error=error, finished_at=time.time()
+            )
+            jobs_finished.inc(status=STATUS_FAILED)
+        except Exception:
+            logger.exception("Could not mark job %s as failed", job_id)
+
+    async def _run(self, job_id):
+        job = await self.get(job_id)
+        if job is None or job["status"] != STATUS_QUEUED:
+            return
+        await asyncio.to_thread(self._update, job_id, status=STATUS_RUNNING, started_at=time.time())
+        try:
+            output_path = await self.handler(job)
+        except asyncio.CancelledError:
+            # On shutdown the job is left as running; start() re-queues it after a restart
+            if asyncio.current_task().cancelling():
+                raise
+            await self._mark_failed(job_id, "Cancelled")
+        except Exception as e:
+            await self._mark_failed(job_id, str(e) or type(e).__name__)
+        else:
+            await asyncio.to_thread(
+                self._update, job_id, status=STATUS_SUCCEEDED, output_path=output_path, finished_at=time.time()
+            )
+            jobs_finished.inc(status=STATUS_SUCCEEDED)
+
+    def depth(self):
+        return self._queue.qsize() if self._queue is not None else 0
+
+
+job_queue = JobQueue()
+
+Gauge("jobs_queued", "Background generate jobs waiting for a worker", function=job_queue.depth)
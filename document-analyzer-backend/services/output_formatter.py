@@ -1,13 +1,126 @@
-from docx import Document
+import asyncio
+import io
 import os
+import re
+
+from aiofiles import open as aio_open
+from docx import Document
+
+from utils.file_storage import remove_quietly, temp_path_for
+from utils.metrics import docx_render_duration
+from utils.worker_pool import get_process_pool
 
 OUTPUT_DIR = "storage/outputs"
+# Optional .docx whose styles, headers and footers are reused for every report
+DOCX_TEMPLATE_PATH = os.getenv("DOCX_TEMPLATE_PATH")
+DOCUMENT_TITLE = "Emergency Animal Boarding Program"
+
+MARKDOWN_HEADING = re.compile(r"^(#{1,6})\s+(.*)$")
+BOLD_HEADING = re.compile(r"^\*\*(.+?)\*\*:?$")
+BULLET_ITEM = re.compile(r"^[-*•]\s+(.*)$")
+NUMBERED_ITEM = re.compile(r"^\d+[.)]\s+(.*)$")
+BOLD_SPAN = re.compile(r"\*\*(.+?)\*\*")
+
+STYLE_NAMES = ("Title", "Heading 1", "Heading 2", "Heading 3", "List Bullet", "List Number")
+
+# Serialized template with styles and title, built once per process
+_template_bytes = None
+# Style name -> style id; looking styles up by name costs milliseconds per paragraph
+_style_ids = {}
+
+
+def _new_document():
+    global _template_bytes
+    if _template_bytes is None:
+        template = Document(DOCX_TEMPLATE_PATH)
+        # Custom templates may not define every style; those fall back to Normal
+        _style_ids.update(
+            (name, template.styles[name].style_id) for name in STYLE_NAMES if name in template.styles
+        )
+        _add_paragraph(template, DOCUMENT_TITLE, "Title")
+        buffer = io.BytesIO()
+        template.save(buffer)
+        _template_bytes = buffer.getvalue()
+    return Document(io.BytesIO(_template_bytes))
+
+
+def _add_paragraph(doc, text, style_name=None):
+    paragraph = doc.add_paragraph()
+    style_id = _style_ids.get(style_name)
+    if style_id is not None:
+        paragraph._p.style = style_id
+    _add_text(paragraph, text)
+    return paragraph
+
+
+def _add_text(paragraph, text):
+    # Keep **bold** spans from the model output as bold runs
+    position = 0
+    for match in BOLD_SPAN.finditer(text):
+        if match.start() > position:
+            paragraph.add_run(text[position:match.start()])
+        paragraph.add_run(match.group(1)).bold = True
+        position = match.end()
+    if position < len(text):
+        paragraph.add_run(text[position:])
+
+
+def _render_sections(doc, extracted_text):
+    paragraph_lines = []
+
+    def flush_paragraph():
+        if paragraph_lines:
+            _add_paragraph(doc, " ".join(paragraph_lines))
+            paragraph_lines.clear()
+
+    for line in extracted_text.splitlines():
+        line = line.strip()
+        if not line:
+            flush_paragraph()
+            continue
+        if match := MARKDOWN_HEADING.match(line):
+            flush_paragraph()
+            _add_paragraph(doc, match.group(2).strip("#* "), f"Heading {min(len(match.group(1)), 3)}")
+        elif match := BOLD_HEADING.match(line):
+            flush_paragraph()
+            _add_paragraph(doc, match.group(1).rstrip(":"), "Heading 2")
+        elif match := BULLET_ITEM.match(line):
+            flush_paragraph()
+            _add_paragraph(doc, match.group(1), "List Bullet")
+        elif match := NUMBERED_ITEM.match(line):
+            flush_paragraph()
+            _add_paragraph(doc, match.group(1), "List Number")
+        else:
+            paragraph_lines.append(line)
+    flush_paragraph()
+
+
+def render_docx(extracted_text):
+    """Build the report and return it as .docx bytes."""
+    doc = _new_document()
+    _render_sections(doc, extracted_text)
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+
+async def render_docx_async(extracted_text):
+    # python-docx/lxml work runs in the process pool, off the event loop
+    loop = asyncio.get_running_loop()
+    # Timed here since observations made inside the worker process are lost
+    with docx_render_duration.time():
+        return await loop.run_in_executor(get_process_pool(), render_docx, extracted_text)
+
 
-def create_docx(extracted_text, filename):
+async def create_docx_async(extracted_text, filename):
+    content = await render_docx_async(extracted_text)
     os.makedirs(OUTPUT_DIR, exist_ok=True)
-    doc = Document()
-    doc.add_heading("Emergency Animal Boarding Program", 0)
-    doc.add_paragraph(extracted_text)
     save_path = f"{OUTPUT_DIR}/{filename}.docx"
-    doc.save(save_path)
+    temp_path = temp_path_for(save_path)
+    try:
+        async with aio_open(temp_path, "wb") as out_file:
+            await out_file.write(content)
+        os.replace(temp_path, save_path)
+    finally:
+        remove_quietly(temp_path)
     return save_path
@@ -0,0 +1,165 @@
+import asyncio
+import hashlib
+import os
+import sqlite3
+import time
+
+from utils.metrics import Gauge, cache_requests
+
+CACHE_DIR = "storage/cache"
+CACHE_DB_PATH = f"{CACHE_DIR}/analysis.sqlite3"
+CACHE_TTL_SECONDS = float(os.getenv("CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "10000"))
+
+
+def make_key(*parts):
+    digest = hashlib.sha256()
+    for part in parts:
+        encoded = part.encode("utf-8")
+        # Length prefix keeps ("ab", "c") and ("a", "bc") distinct
+        digest.update(f"{len(encoded)}:".encode("ascii"))
+        digest.update(encoded)
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """SQLite-backed string cache with TTL, LRU eviction and single-flight."""
+
+    def __init__(self, db_path=CACHE_DB_PATH, ttl=CACHE_TTL_SECONDS, max_entries=CACHE_MAX_ENTRIES):
+        self.db_path = db_path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._inflight = {}
+        self._initialized = False
+
+    def _connect(self):
+        if not self._initialized:
+            os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        if not self._initialized:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS results (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )"""
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_results_accessed ON results (accessed_at)")
+            self._initialized = True
+        return conn
+
+    def _get(self, key):
+        now = time.time()
+        conn = self._connect()
+        try:
+            with conn:
+                row = conn.execute(
+                    "SELECT value, created_at FROM results WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None:
+                    return None
+                if self.ttl and now - row[1] > self.ttl:
+                    conn.execute("DELETE FROM results WHERE key = ?", (key,))
+                    return None
+                conn.execute("UPDATE results SET accessed_at = ? WHERE key = ?", (now, key))
+                return row[0]
+        finally:
+            conn.close()
+
+    def _set(self, key, value):
+        now = time.time()
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO results (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                    (key, value, now, now),
+                )
+                if self.ttl:
+                    conn.execute("DELETE FROM results WHERE created_at < ?", (now - self.ttl,))
+                # Evict least recently used entries beyond the size limit
+                conn.execute(
+                    """DELETE FROM results WHERE key IN (
+                        SELECT key FROM results ORDER BY accessed_at DESC LIMIT -1 OFFSET ?
+                    )""",
+                    (self.max_entries,),
+                )
+        finally:
+            conn.close()
+
+    async def get(self, key):
+        return await asyncio.to_thread(self._get, key)
+
+    async def set(self, key, value):
+        await asyncio.to_thread(self._set, key, value)
+
+    async def _load(self, key, compute):
+        value = await self.get(key)
+        if value is not None:
+            self.hits += 1
+            cache_requests.inc(result="hit")
+            return value
+        self.misses += 1
+        cache_requests.inc(result="miss")
+        value = await compute()
+        # e.g. a completion with no content; returned but not cached
+        if value is not None:
+            await self.set(key, value)
+        return value
+
+    def _forget(self, key, task):
+        if self._inflight.get(key, (None,))[0] is task:
+            del self._inflight[key]
+        # Mark retrieved so a failure nobody waited for isn't logged as never retrieved
+        if not task.cancelled():
+            task.exception()
+
+    async def get_or_compute(self, key, compute):
+        """Return the cached value for key, or await compute() and store it.
+
+        Concurrent callers asking for the same key share a single compute(),
+        run in a task owned by the cache. One caller being cancelled does not
+        affect the others; the task is only cancelled once no caller is left.
+        """
+        inflight = self._inflight.get(key)
+        if inflight is None:
+            task = asyncio.create_task(self._load(key, compute))
+            # [task, number of callers waiting on it]
+            inflight = self._inflight[key] = [task, 0]
+            task.add_done_callback(lambda done: self._forget(key, done))
+        else:
+            self.hits += 1
+            cache_requests.inc(result="shared")
+
+        task = inflight[0]
+        inflight[1] += 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if inflight[1] == 1 and not task.done():
+                task.cancel()
+            raise
+        finally:
+            inflight[1] -= 1
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / total if total else 0.0,
+            "inflight": len(self._inflight),
+        }
+
+
+analysis_cache = ResultCache()
+
+Gauge(
+    "analysis_cache_hit_ratio",
+    "Share of analysis lookups served from cache or a shared in-flight call",
+    function=lambda: analysis_cache.stats()["hit_ratio"],
+)
@@ -0,0 +1,94 @@
+import asyncio
+
+import pytest
+
+from services import ai_processor
+from services.chunker import CHARS_PER_TOKEN, chunk_text, estimate_tokens
+from services.result_cache import ResultCache, make_key
+
+
+class FakeLLM:
+    """Stands in for chat_completion and records every prompt it receives."""
+
+    def __init__(self):
+        self.prompts = []
+
+    async def __call__(self, prompt):
+        self.prompts.append(prompt)
+        return f"answer {make_key(prompt)[:12]}"
+
+
+@pytest.fixture
+def llm(monkeypatch, tmp_path):
+    fake = FakeLLM()
+    monkeypatch.setattr(ai_processor, "OPENAI_API_KEY", "test")
+    monkeypatch.setattr(ai_processor, "chat_completion", fake)
+    monkeypatch.setattr(ai_processor, "analysis_cache", ResultCache(db_path=str(tmp_path / "cache.sqlite3")))
+    return fake
+
+
+def cached(template, text):
+    key = make_key(text, template, ai_processor.OPENAI_MODEL)
+    return asyncio.run(ai_processor.analysis_cache.get(key))
+
+
+def reduce_prompt(partials):
+    return ai_processor.REDUCE_PROMPT_TEMPLATE.format(text=ai_processor.PARTIAL_SEPARATOR.join(partials))
+
+
+def reduced_texts(llm):
+    prefix, suffix = ai_processor.REDUCE_PROMPT_TEMPLATE.split("{text}")
+    assert all(prompt.startswith(prefix) and prompt.endswith(suffix) for prompt in llm.prompts)
+    return [prompt[len(prefix):len(prompt) - len(suffix)] for prompt in llm.prompts]
+
+
+def test_short_document_is_one_cached_call(llm):
+    result = asyncio.run(ai_processor.analyze_document("Dogs  need\n\nwater"))
+    text = ai_processor.normalize_text("Dogs  need\n\nwater")
+    assert llm.prompts == [ai_processor.PROMPT_TEMPLATE.format(text=text)]
+    assert cached(ai_processor.PROMPT_TEMPLATE, text) == result
+    asyncio.run(ai_processor.analyze_document("Dogs need\n\nwater"))
+    assert len(llm.prompts) == 1
+
+
+def test_long_document_maps_chunks_then_reduces(llm):
+    text = "\n\n".join(f"Section {index}: " + " ".join(["shelter"] * 30) for index in range(400))
+    chunks = chunk_text(ai_processor.normalize_text(text))
+    assert len(chunks) > 1
+
+    result = asyncio.run(ai_processor.analyze_document(text))
+    map_prompts = [ai_processor.MAP_PROMPT_TEMPLATE.format(text=chunk) for chunk in chunks]
+    # Map calls run concurrently, so only the final reduce has a fixed position
+    assert sorted(llm.prompts[:len(chunks)]) == sorted(map_prompts)
+    partials = [cached(ai_processor.MAP_PROMPT_TEMPLATE, chunk) for chunk in chunks]
+    assert all(partials)
+    assert llm.prompts[len(chunks):] == [reduce_prompt(partials)]
+    reduce_text = ai_processor.PARTIAL_SEPARATOR.join(partials)
+    assert cached(ai_processor.REDUCE_PROMPT_TEMPLATE, reduce_text) == result
+
+
+def test_reduce_single_group_is_one_call(llm):
+    result = asyncio.run(ai_processor._reduce(["a", "b", "c"], 100))
+    assert llm.prompts == [reduce_prompt(["a", "b", "c"])]
+    assert cached(ai_processor.REDUCE_PROMPT_TEMPLATE, ai_processor.PARTIAL_SEPARATOR.join("abc")) == result
+
+
+def test_reduce_merges_level_by_level(llm):
+    partials = [f"{index}" + "p" * 40 * CHARS_PER_TOKEN for index in range(8)]
+    result = asyncio.run(ai_processor._reduce(partials, 100))
+    texts = reduced_texts(llm)
+    assert len(texts) > 1
+    # Every original partial is merged exactly once, before the final call
+    merged = [part for text in texts[:-1] for part in text.split(ai_processor.PARTIAL_SEPARATOR)]
+    assert sorted(part for part in merged if part in partials) == partials
+    assert not set(texts[-1].split(ai_processor.PARTIAL_SEPARATOR)) & set(partials)
+    assert cached(ai_processor.REDUCE_PROMPT_TEMPLATE, texts[-1]) == result
+
+
+def test_reduce_caps_oversized_partials(llm):
+    partials = [f"{index}" + "z" * 1000 * CHARS_PER_TOKEN for index in range(5)]
+    asyncio.run(ai_processor._reduce(partials, 100))
+    texts = reduced_texts(llm)
+    separator_tokens = estimate_tokens(ai_processor.PARTIAL_SEPARATOR)
+    assert all(estimate_tokens(text) <= 100 + separator_tokens for text in texts)
+    assert ai_processor.TRUNCATION_MARKER.strip() in texts[0]
@@ -0,0 +1,42 @@
+from benchmarks.compare import compare_results
+from benchmarks.run_benchmarks import percentile
+
+
+def test_percentile_is_nearest_rank():
+    values = list(range(1, 101))
+    assert percentile(values, 0.50) == 50
+    assert percentile(values, 0.95) == 95
+    assert percentile(values, 0.99) == 99
+    assert percentile([1, 2, 3, 4], 0.5) == 2
+    assert percentile([1, 2, 3, 4], 0.51) == 3
+
+
+def test_percentile_edges():
+    assert percentile([], 0.5) == 0.0
+    assert percentile([7], 0.99) == 7
+    assert percentile([1, 2, 3], 0.0) == 1
+    assert percentile([1, 2, 3], 1.0) == 3
+
+
+def results(throughput, p95, rss):
+    return {"results": {"extract": {"c4": {"throughput_per_s": throughput, "p95_ms": p95, "peak_rss_mb": rss}}}}
+
+
+def test_compare_within_threshold_passes():
+    assert compare_results(results(9, 110, 105), results(10, 100, 100), 0.25) == []
+
+
+def test_compare_flags_each_regression():
+    regressions = compare_results(results(5, 200, 200), results(10, 100, 100), 0.25)
+    assert len(regressions) == 3
+    assert all(regression.startswith("extract c4: ") for regression in regressions)
+
+
+def test_compare_ignores_improvements():
+    assert compare_results(results(20, 50, 50), results(10, 100, 100), 0.25) == []
+
+
+def test_compare_reports_missing_levels():
+    assert compare_results({"results": {}}, results(10, 100, 100), 0.25) == [
+        "extract c4: missing from current results"
+    ]
@@ -0,0 +1,46 @@
+from services.chunker import CHARS_PER_TOKEN, chunk_text, estimate_tokens, split_sections
+from services.document_parser import PAGE_SEPARATOR
+
+
+def make_sections(count, words=20):
+    return [f"Section {index}: " + " ".join(f"word{index}" for _ in range(words)) for index in range(count)]
+
+
+def test_split_sections_on_pages_and_blank_lines():
+    text = f"a1\n\na2{PAGE_SEPARATOR}b1\n  \nb2"
+    assert list(split_sections(text)) == ["a1", "a2", "b1", "b2"]
+
+
+def test_split_sections_breaks_oversized_sections():
+    section = "x" * (10 * CHARS_PER_TOKEN * 3)
+    pieces = list(split_sections(section, max_tokens=10))
+    assert "".join(pieces) == section
+    assert all(estimate_tokens(piece) <= 10 for piece in pieces)
+
+
+def test_chunks_respect_max_tokens_and_keep_every_section():
+    sections = make_sections(60)
+    chunks = chunk_text("\n\n".join(sections), max_tokens=200, overlap_tokens=0)
+    assert len(chunks) > 1
+    assert all(estimate_tokens(chunk) <= 200 for chunk in chunks)
+    assert [s for chunk in chunks for s in chunk.split("\n\n")] == sections
+
+
+def test_chunks_overlap_with_previous_chunk_tail():
+    sections = make_sections(60)
+    overlap = max(estimate_tokens(section) for section in sections) + 1
+    chunks = chunk_text("\n\n".join(sections), max_tokens=200, overlap_tokens=overlap)
+    for previous, current in zip(chunks, chunks[1:]):
+        assert current.split("\n\n")[0] == previous.split("\n\n")[-1]
+
+
+def test_editing_one_section_leaves_distant_chunks_unchanged():
+    sections = make_sections(200)
+    before = chunk_text("\n\n".join(sections), max_tokens=200, overlap_tokens=0)
+    sections[100] = sections[100].replace("word100", "edited", 1)
+    after = chunk_text("\n\n".join(sections), max_tokens=200, overlap_tokens=0)
+    changed = set(before) ^ set(after)
+    # Content-defined boundaries resynchronise shortly after the edit
+    assert 0 < len(changed) <= 6
+    assert before[0] == after[0] and before[-1] == after[-1]
+
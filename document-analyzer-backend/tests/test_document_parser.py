@@ -0,0 +1,22 @@
+import asyncio
+
+import pytest
+
+from services import document_parser
+
+
+def test_corrupt_docx_raises_parse_error(monkeypatch, tmp_path):
+    monkeypatch.setattr(document_parser, "EXTRACT_DIR", str(tmp_path / "extracted"))
+    path = tmp_path / "bad.docx"
+    path.write_bytes(b"PK not really a zip")
+    with pytest.raises(document_parser.DocumentParseError):
+        asyncio.run(document_parser.extract_text(str(path)))
+    # Nothing is cached for a document that failed to parse
+    assert list((tmp_path / "extracted").iterdir()) == []
+
+
+def test_original_filename_strips_stored_hash_prefix():
+    digest = "ab" * 32
+    assert document_parser.original_filename(f"storage/uploads/{digest}_plan.pdf") == "plan.pdf"
+    assert document_parser.original_filename(f"storage/uploads/{digest}_{digest}_x.pdf") == f"{digest}_x.pdf"
+    assert document_parser.original_filename("storage/uploads/plan.pdf") == "plan.pdf"
@@ -0,0 +1,111 @@
+import asyncio
+import time
+
+import pytest
+
+from services.job_queue import STATUS_FAILED, STATUS_QUEUED, STATUS_RUNNING, STATUS_SUCCEEDED, JobQueue
+
+
+def make_queue(tmp_path, handler, workers=1):
+    return JobQueue(db_path=str(tmp_path / "jobs.sqlite3"), workers=workers, handler=handler)
+
+
+def insert(queue, job_id, priority=0, status=STATUS_QUEUED):
+    queue._insert({
+        "id": job_id,
+        "status": STATUS_QUEUED,
+        "priority": priority,
+        "input_path": f"{job_id}.txt",
+        "created_at": time.time(),
+    })
+    if status != STATUS_QUEUED:
+        queue._update(job_id, status=status)
+
+
+async def wait_finished(queue, job_id):
+    for _ in range(200):
+        job = await queue.get(job_id)
+        if job["status"] in (STATUS_SUCCEEDED, STATUS_FAILED):
+            return job
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+def recording_handler(order):
+    async def handler(job):
+        order.append(job["id"])
+        return f"{job['id']}.docx"
+
+    return handler
+
+
+def test_higher_priority_runs_first(tmp_path):
+    order = []
+    queue = make_queue(tmp_path, recording_handler(order))
+    queue._init_db()
+    for job_id, priority in [("low", 0), ("high", 10), ("low2", 0), ("mid", 5)]:
+        insert(queue, job_id, priority)
+
+    async def main():
+        await queue.start()
+        await wait_finished(queue, "low2")
+        await queue.stop()
+
+    asyncio.run(main())
+    assert order == ["high", "mid", "low", "low2"]
+
+
+def test_start_requeues_running_jobs(tmp_path):
+    order = []
+    queue = make_queue(tmp_path, recording_handler(order))
+    queue._init_db()
+    insert(queue, "interrupted", status=STATUS_RUNNING)
+
+    async def main():
+        await queue.start()
+        job = await wait_finished(queue, "interrupted")
+        await queue.stop()
+        return job
+
+    job = asyncio.run(main())
+    assert order == ["interrupted"]
+    assert job["status"] == STATUS_SUCCEEDED
+    assert job["output_path"] == "interrupted.docx"
+
+
+def test_worker_survives_failures(tmp_path):
+    async def handler(job):
+        if job["input_path"] == "bad.txt":
+            raise ValueError("boom")
+        return "ok.docx"
+
+    queue = make_queue(tmp_path, handler)
+    update = queue._update
+    failed_once = []
+
+    def flaky_update(job_id, **fields):
+        # Fail outside the handler, e.g. a locked database
+        if fields.get("status") == STATUS_RUNNING and not failed_once:
+            failed_once.append(job_id)
+            raise RuntimeError("database is locked")
+        return update(job_id, **fields)
+
+    queue._update = flaky_update
+
+    async def main():
+        await queue.start()
+        jobs = [await queue.submit(path) for path in ("flaky.txt", "bad.txt", "good.txt")]
+        results = [await wait_finished(queue, job["id"]) for job in jobs]
+        await queue.stop()
+        return results
+
+    flaky, bad, good = asyncio.run(main())
+    assert (flaky["status"], flaky["error"]) == (STATUS_FAILED, "database is locked")
+    assert (bad["status"], bad["error"]) == (STATUS_FAILED, "boom")
+    assert good["status"] == STATUS_SUCCEEDED
+
+
+def test_submit_before_start_raises(tmp_path):
+    queue = make_queue(tmp_path, recording_handler([]))
+    with pytest.raises(RuntimeError):
+        asyncio.run(queue.submit("doc.txt"))
@@ -0,0 +1,39 @@
+import io
+
+from docx import Document
+
+from services import output_formatter
+
+
+def use_template(monkeypatch, path):
+    monkeypatch.setattr(output_formatter, "DOCX_TEMPLATE_PATH", path)
+    monkeypatch.setattr(output_formatter, "_template_bytes", None)
+    monkeypatch.setattr(output_formatter, "_style_ids", {})
+
+
+def render(text):
+    return Document(io.BytesIO(output_formatter.render_docx(text)))
+
+
+def test_render_uses_template_styles(monkeypatch):
+    use_template(monkeypatch, None)
+    doc = render("# Plan\n- food\n1. water\nplain text")
+    assert [(p.style.name, p.text) for p in doc.paragraphs] == [
+        ("Title", output_formatter.DOCUMENT_TITLE),
+        ("Heading 1", "Plan"),
+        ("List Bullet", "food"),
+        ("List Number", "water"),
+        ("Normal", "plain text"),
+    ]
+
+
+def test_render_with_template_missing_styles(monkeypatch, tmp_path):
+    template = Document()
+    for name in output_formatter.STYLE_NAMES:
+        template.styles[name].delete()
+    path = tmp_path / "template.docx"
+    template.save(path)
+    use_template(monkeypatch, str(path))
+    doc = render("# Plan\n- food\n1. water")
+    assert [p.text for p in doc.paragraphs] == [output_formatter.DOCUMENT_TITLE, "Plan", "food", "water"]
+    assert {p.style.name for p in doc.paragraphs} == {"Normal"}
@@ -0,0 +1,111 @@
+import asyncio
+
+import pytest
+
+from services import result_cache
+from services.result_cache import ResultCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(result_cache.time, "time", lambda: now[0])
+    return now
+
+
+def make_cache(tmp_path, **kwargs):
+    return ResultCache(db_path=str(tmp_path / "cache.sqlite3"), **kwargs)
+
+
+def counting(value, release=None):
+    calls = []
+
+    async def compute():
+        calls.append(None)
+        if release is not None:
+            await release.wait()
+        return value
+
+    return compute, calls
+
+
+def test_concurrent_callers_share_one_compute(tmp_path):
+    cache = make_cache(tmp_path)
+
+    async def main():
+        release = asyncio.Event()
+        compute, calls = counting("value", release)
+        callers = [asyncio.create_task(cache.get_or_compute("key", compute)) for _ in range(3)]
+        await asyncio.sleep(0.05)
+        release.set()
+        return await asyncio.gather(*callers), calls
+
+    results, calls = asyncio.run(main())
+    assert results == ["value"] * 3
+    assert len(calls) == 1
+    assert asyncio.run(cache.get("key")) == "value"
+
+
+def test_cancelled_caller_does_not_cancel_shared_compute(tmp_path):
+    cache = make_cache(tmp_path)
+
+    async def main():
+        release = asyncio.Event()
+        compute, calls = counting("value", release)
+        first = asyncio.create_task(cache.get_or_compute("key", compute))
+        second = asyncio.create_task(cache.get_or_compute("key", compute))
+        await asyncio.sleep(0.05)
+        first.cancel()
+        await asyncio.sleep(0)
+        release.set()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second, calls
+
+    value, calls = asyncio.run(main())
+    assert value == "value"
+    assert len(calls) == 1
+
+
+def test_last_cancelled_caller_cancels_compute(tmp_path):
+    cache = make_cache(tmp_path)
+
+    async def main():
+        compute, _ = counting("value", asyncio.Event())
+        caller = asyncio.create_task(cache.get_or_compute("key", compute))
+        await asyncio.sleep(0.05)
+        task = cache._inflight["key"][0]
+        caller.cancel()
+        await asyncio.gather(caller, return_exceptions=True)
+        await asyncio.sleep(0)
+        return task
+
+    assert asyncio.run(main()).cancelled()
+
+
+def test_none_is_returned_but_not_cached(tmp_path):
+    cache = make_cache(tmp_path)
+    compute, calls = counting(None)
+    assert asyncio.run(cache.get_or_compute("key", compute)) is None
+    assert asyncio.run(cache.get_or_compute("key", compute)) is None
+    assert len(calls) == 2
+
+
+def test_entries_expire_after_ttl(tmp_path, clock):
+    cache = make_cache(tmp_path, ttl=60)
+    asyncio.run(cache.set("key", "value"))
+    clock[0] += 59
+    assert asyncio.run(cache.get("key")) == "value"
+    clock[0] += 2
+    assert asyncio.run(cache.get("key")) is None
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path, clock):
+    cache = make_cache(tmp_path, max_entries=2)
+    for key in ("a", "b"):
+        asyncio.run(cache.set(key, key))
+        clock[0] += 1
+    asyncio.run(cache.get("a"))
+    clock[0] += 1
+    asyncio.run(cache.set("c", "c"))
+    assert [asyncio.run(cache.get(key)) for key in ("a", "b", "c")] == ["a", None, "c"]
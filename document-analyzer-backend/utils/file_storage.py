@@ -0,0 +1,29 @@
+import hashlib
+import os
+import uuid
+
+STORAGE_DIR = "storage"
+
+# Read/write granularity for streamed file I/O
+CHUNK_SIZE = 1024 * 1024
+
+
+def temp_path_for(path):
+    # Temp file lives next to the target so os.replace stays an atomic rename
+    directory, name = os.path.split(path)
+    return os.path.join(directory, f".{name}.{uuid.uuid4().hex}.tmp")
+
+
+def remove_quietly(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
@@ -0,0 +1,67 @@
+import asyncio
+import cProfile
+import io
+import os
+import pstats
+import time
+
+# Only installed when enabled, so there is no per-request cost otherwise
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "0") == "1"
+PROFILE_HEADER = b"x-profile"
+PROFILE_TOP_N = int(os.getenv("PROFILE_TOP_N", "40"))
+
+
+class ProfilingMiddleware:
+    """Profile a request when it carries an ``X-Profile: 1`` header.
+
+    The normal response body is discarded and replaced by a plain-text
+    cProfile summary; the original status is sent as X-Profile-Status.
+    cProfile sees the whole event loop thread, so work for other requests
+    running at the same time shows up in the summary too.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        # cProfile supports one active profiler per thread
+        self._lock = asyncio.Lock()
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or dict(scope["headers"]).get(PROFILE_HEADER) != b"1"
+            or self._lock.locked()
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def discard_response(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+
+        async with self._lock:
+            profiler = cProfile.Profile()
+            start = time.perf_counter()
+            profiler.enable()
+            try:
+                await self.app(scope, receive, discard_response)
+            finally:
+                profiler.disable()
+            elapsed = time.perf_counter() - start
+
+        report = io.StringIO()
+        report.write(f"{scope['method']} {scope['path']} -> {status} in {elapsed:.4f}s\n\n")
+        pstats.Stats(profiler, stream=report).sort_stats("cumulative").print_stats(PROFILE_TOP_N)
+        body = report.getvalue().encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [
+                (b"content-type", b"text/plain; charset=utf-8"),
+                (b"content-length", str(len(body)).encode("ascii")),
+                (b"x-profile-status", str(status).encode("ascii")),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
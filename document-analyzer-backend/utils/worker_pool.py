@@ -0,0 +1,26 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+# Processes used for CPU-bound work (PDF text extraction, DOCX rendering)
+WORKER_PROCESSES = int(os.getenv("WORKER_PROCESSES", str(os.cpu_count() or 1)))
+
+_pool = None
+
+
+def get_process_pool():
+    global _pool
+    if _pool is None:
+        # spawn avoids forking a process that already runs an event loop and threads
+        _pool = ProcessPoolExecutor(
+            max_workers=WORKER_PROCESSES,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _pool
+
+
+def shutdown_process_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=True, cancel_futures=True)
+    _pool = None